@@ -1,13 +1,27 @@
+import atexit
+import collections
+import hashlib
 import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-import psycopg
-from psycopg.rows import dict_row
+from jinja2 import FileSystemBytecodeCache
 
-from flask import Flask, render_template, request, redirect, url_for, flash
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import ConnectionPool
+
+from flask import Flask, g, make_response, render_template, request, redirect, session, url_for, flash
+from flask_compress import Compress
 from flask_login import (
     LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 )
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError
 
 
 # =========================================================
@@ -22,12 +36,68 @@ app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 # app.config["SESSION_COOKIE_SECURE"] = True  # ligar no Render (HTTPS)
 
+# brotli/gzip nas respostas (HTML e estáticos): texto comprime 4-6x.
+# A reavaliação condicional é essencial: o Flask-Compress sufixa o ETag com
+# o algoritmo (':gzip'/':br') e precisa reexecutar o If-None-Match depois
+# disso, senão navegador nenhum consegue revalidar e o 304 da vitrine morre.
+app.config["COMPRESS_EVALUATE_CONDITIONAL_REQUEST"] = True
+Compress(app)
+
+# templates compilados sobrevivem a restart de worker (bytecode em disco);
+# o cache em memória segura todos os templates do app com folga
+_JINJA_BC_DIR = os.path.join(tempfile.gettempdir(), "ipe-jinja-cache")
+os.makedirs(_JINJA_BC_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(_JINJA_BC_DIR, "%s.cache")
+app.jinja_env.cache_size = 1000
+
+
+def _warm_templates():
+    # compila tudo no boot, fora do caminho do primeiro request
+    for name in app.jinja_env.list_templates(filter_func=lambda n: n.endswith(".html")):
+        try:
+            app.jinja_env.get_template(name)
+        except Exception as e:
+            print("Erro ao pré-compilar template:", name, e)
+
+
+_warm_templates()
+
+# Fingerprint dos estáticos: url_for('static', ...) ganha ?v=<hash do
+# conteúdo>, o que permite cache de 1 ano no navegador/CDN com invalidação
+# automática no deploy — o hash muda junto com o arquivo.
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 31536000  # 1 ano
+
+_static_digests = {}
+
+
+def _static_digest(filename: str) -> str:
+    d = _static_digests.get(filename)
+    if d is None:
+        try:
+            with open(os.path.join(app.static_folder, filename), "rb") as f:
+                d = hashlib.md5(f.read()).hexdigest()[:8]
+        except OSError:
+            d = ""
+        _static_digests[filename] = d
+    return d
+
+
+@app.url_defaults
+def _add_static_version(endpoint, values):
+    if endpoint == "static" and "filename" in values:
+        v = _static_digest(values["filename"])
+        if v:
+            values.setdefault("v", v)
+
+
 REQUIRE_INVITE = os.environ.get("IPE_REQUIRE_INVITE", "0").strip().lower() in ("1", "true", "yes")
 INVITE_CODE = os.environ.get("IPE_INVITE_CODE", "IPE2026")
 
 AREAS = ["Saúde", "Tecnologia", "Humanas", "Exatas", "Biológicas"]
 EVIDENCIAS = ["Forte", "Moderada", "Inicial"]
 
+PAGE_SIZE = 24  # cards por página nas listagens
+
 
 # =========================================================
 # POSTGRES (NEON)
@@ -46,13 +116,54 @@ if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL não configurada. Defina a conexão do Neon no ambiente (Render env).")
 
 
-def get_conn():
-    return psycopg.connect(DATABASE_URL, row_factory=dict_row)
+def _configure_conn(conn):
+    # prepara no servidor já na 2ª execução do mesmo SQL (padrão é a 6ª):
+    # as consultas quentes (load_user, toggles, listagens) pulam parse+plan
+    conn.prepare_threshold = 1
+
+
+# Pool de conexões por processo: evita o handshake TCP+TLS+auth do Neon
+# a cada request. Dimensionar max_size junto com o número de workers do gunicorn.
+POOL = ConnectionPool(
+    DATABASE_URL,
+    min_size=2,
+    max_size=int(os.environ.get("IPE_DB_POOL_SIZE", "10")),
+    configure=_configure_conn,
+    # pre-ping no checkout: o Neon derruba conexões ociosas; melhor pagar um
+    # ping barato do que entregar conexão morta a um request
+    check=ConnectionPool.check_connection,
+    kwargs={"row_factory": dict_row},
+)
+atexit.register(POOL.close)
+
+
+@contextmanager
+def get_conn(readonly: bool = False):
+    # Entrega uma conexão do pool e a devolve na saída — os
+    # `with get_conn() as conn:` continuam iguais. As linhas saem como dict
+    # (templates fazem p["x"]); caminhos quentes que só precisam de escalares
+    # abrem o cursor com row_factory=tuple_row.
+    #
+    # readonly=True liga autocommit: rotas que só fazem SELECT pulam o par
+    # BEGIN/COMMIT implícito (um round-trip a menos por leitura no Neon).
+    with POOL.connection() as conn:
+        if not readonly:
+            yield conn
+            return
+        conn.autocommit = True
+        try:
+            yield conn
+        finally:
+            conn.autocommit = False
 
 
 def init_db():
     with get_conn() as conn:
         with conn.cursor() as cur:
+            # serializa workers concorrentes disputando o DDL no deploy;
+            # lock transacional: solta sozinho no commit
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext('ipe_init'));")
+
             # users
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS users (
@@ -112,20 +223,112 @@ def init_db():
                 );
             """)
 
+            # contadores denormalizados: evitam agregar likes/saves inteiros
+            # a cada listagem; mantidos por trigger em likes/saves
+            cur.execute("ALTER TABLE pesquisas ADD COLUMN IF NOT EXISTS likes_count INTEGER NOT NULL DEFAULT 0;")
+            cur.execute("ALTER TABLE pesquisas ADD COLUMN IF NOT EXISTS saves_count INTEGER NOT NULL DEFAULT 0;")
+
+            cur.execute("""
+                CREATE OR REPLACE FUNCTION ipe_bump_likes() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        UPDATE pesquisas SET likes_count = likes_count + 1 WHERE id = NEW.pesquisa_id;
+                    ELSE
+                        UPDATE pesquisas SET likes_count = likes_count - 1 WHERE id = OLD.pesquisa_id;
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$;
+            """)
+            cur.execute("""
+                CREATE OR REPLACE FUNCTION ipe_bump_saves() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        UPDATE pesquisas SET saves_count = saves_count + 1 WHERE id = NEW.pesquisa_id;
+                    ELSE
+                        UPDATE pesquisas SET saves_count = saves_count - 1 WHERE id = OLD.pesquisa_id;
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$;
+            """)
+            cur.execute("DROP TRIGGER IF EXISTS trg_likes_count ON likes;")
+            cur.execute("""
+                CREATE TRIGGER trg_likes_count
+                AFTER INSERT OR DELETE ON likes
+                FOR EACH ROW EXECUTE FUNCTION ipe_bump_likes();
+            """)
+            cur.execute("DROP TRIGGER IF EXISTS trg_saves_count ON saves;")
+            cur.execute("""
+                CREATE TRIGGER trg_saves_count
+                AFTER INSERT OR DELETE ON saves
+                FOR EACH ROW EXECUTE FUNCTION ipe_bump_saves();
+            """)
+
+            # backfill idempotente (só reescreve linhas divergentes)
+            cur.execute("""
+                UPDATE pesquisas p SET likes_count = c.n
+                FROM (SELECT pesquisa_id, COUNT(*)::int AS n FROM likes GROUP BY pesquisa_id) c
+                WHERE p.id = c.pesquisa_id AND p.likes_count <> c.n;
+            """)
+            cur.execute("""
+                UPDATE pesquisas p SET saves_count = c.n
+                FROM (SELECT pesquisa_id, COUNT(*)::int AS n FROM saves GROUP BY pesquisa_id) c
+                WHERE p.id = c.pesquisa_id AND p.saves_count <> c.n;
+            """)
+
             # índices
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_area ON pesquisas(area);")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_pesquisador ON pesquisas(pesquisador);")
+            # obs.: o UNIQUE(email) de users já cria o índice que atende o
+            # login; o idx_users_email antigo era uma cópia redundante dele
+            cur.execute("DROP INDEX IF EXISTS idx_users_email;")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_data ON pesquisas(data_publicacao);")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_user ON pesquisas(pesquisador_id);")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_likes_pesquisa ON likes(pesquisa_id);")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_saves_pesquisa ON saves(pesquisa_id);")
+
+            # compostos (filtro, ordenação): atendem WHERE + ORDER BY id DESC
+            # sem etapa de sort — o Postgres percorre o índice e para no LIMIT
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_area_id ON pesquisas(area, id DESC);")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_autor_id ON pesquisas(pesquisador, id DESC);")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_user_id ON pesquisas(pesquisador_id, id DESC);")
+
+            # antigos de coluna única, cobertos pelos compostos acima
+            cur.execute("DROP INDEX IF EXISTS idx_pesquisas_area;")
+            cur.execute("DROP INDEX IF EXISTS idx_pesquisas_pesquisador;")
+            cur.execute("DROP INDEX IF EXISTS idx_pesquisas_user;")
+
+            # busca: ILIKE '%q%' não usa B-tree; índices de trigrama (pg_trgm)
+            # atendem o wildcard à esquerda sem varrer a tabela
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_titulo_trgm ON pesquisas USING GIN (titulo gin_trgm_ops);")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_descoberta_trgm ON pesquisas USING GIN (descoberta gin_trgm_ops);")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_pesquisas_autor_trgm ON pesquisas USING GIN (pesquisador gin_trgm_ops);")
+            # (pesquisa_id, user_id): o EXISTS da página de detalhe resolve
+            # como index-only scan; o UNIQUE(user_id, pesquisa_id) já cobre a
+            # direção inversa usada pelo toggle
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_likes_pesquisa_user ON likes(pesquisa_id, user_id);")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_saves_pesquisa_user ON saves(pesquisa_id, user_id);")
+            cur.execute("DROP INDEX IF EXISTS idx_likes_pesquisa;")
+            cur.execute("DROP INDEX IF EXISTS idx_saves_pesquisa;")
 
         conn.commit()
 
 
+def ensure_schema():
+    # sonda barata no boot de cada worker: 1 round-trip em vez de ~30 DDLs;
+    # o init_db() completo só roda quando o schema ainda não existe
+    with get_conn(readonly=True) as conn:
+        with conn.cursor(row_factory=tuple_row) as cur:
+            cur.execute("SELECT to_regclass('public.pesquisas') IS NOT NULL")
+            existe = cur.fetchone()[0]
+    if not existe:
+        init_db()
+
+
 try:
-    init_db()
+    if os.environ.get("IPE_INIT_DB", "0").strip().lower() in ("1", "true", "yes"):
+        init_db()  # forçado no deploy (novas migrações/índices)
+    else:
+        ensure_schema()
 except Exception as e:
     print("Erro ao iniciar DB:", e)
 
@@ -133,36 +336,82 @@ except Exception as e:
 # =========================================================
 # HELPERS
 # =========================================================
+def form_str(key: str, default: str = "", lower: bool = False) -> str:
+    # leitura de campo de formulário em uma passada: um strip, um lower
+    # opcional, sem o encadeamento (request.form.get(x) or "").strip() em
+    # cada rota. Mantém .lower() (e não casefold) para bater com os emails
+    # já normalizados assim no banco.
+    v = (request.form.get(key) or default).strip()
+    return v.lower() if lower else v
+
+
 def normalize_original_link(raw: str) -> str:
     s = (raw or "").strip()
     if not s:
         return s
-    lower = s.lower()
+
+    # só o prefixo decide o caso — baixa 8 chars em vez da URL inteira
+    prefix = s[:8].lower()
 
     # DOI puro
-    if s.startswith("10.") and "/" in s:
+    if prefix.startswith("10.") and "/" in s:
         return "https://doi.org/" + s
 
     # doi.org/ sem esquema
-    if lower.startswith("doi.org/"):
+    if prefix == "doi.org/":
         return "https://" + s
 
-    if lower.startswith("http://") or lower.startswith("https://"):
+    if prefix.startswith(("http://", "https://")):
         return s
 
     return "https://" + s
 
 
 def is_owner(p: dict) -> bool:
-    return current_user.is_authenticated and int(p["pesquisador_id"]) == int(current_user.id)
+    return current_user.is_authenticated and int(p["pesquisador_id"]) == current_user.id
+
+
+# =========================================================
+# VIEWS (write-behind)
+# =========================================================
+# Cada page view não grava mais um UPDATE síncrono (row lock + WAL na hora
+# do request): acumula num Counter e um thread de fundo descarrega em lote.
+_VIEW_FLUSH_INTERVAL = 5  # segundos
+_view_buffer = collections.Counter()
+_view_lock = threading.Lock()
+
+
+def _flush_views():
+    with _view_lock:
+        if not _view_buffer:
+            return
+        pending = dict(_view_buffer)
+        _view_buffer.clear()
+
+    try:
+        with get_conn() as conn:
+            with conn.cursor(row_factory=tuple_row) as cur:
+                cur.execute("""
+                    UPDATE pesquisas SET views = views + v.delta
+                    FROM (SELECT unnest(%s::int[]) AS id, unnest(%s::int[]) AS delta) v
+                    WHERE pesquisas.id = v.id
+                """, (list(pending.keys()), list(pending.values())))
+            conn.commit()
+    except Exception as e:
+        print("Erro ao gravar views:", e)
+        # devolve ao buffer para tentar no próximo ciclo
+        with _view_lock:
+            _view_buffer.update(pending)
+
 
+def _views_flusher():
+    while True:
+        time.sleep(_VIEW_FLUSH_INTERVAL)
+        _flush_views()
 
-def get_like_save_state(cur, pesquisa_id: int, user_id: int) -> tuple[bool, bool]:
-    cur.execute("SELECT 1 FROM likes WHERE pesquisa_id=%s AND user_id=%s", (pesquisa_id, user_id))
-    liked = cur.fetchone() is not None
-    cur.execute("SELECT 1 FROM saves WHERE pesquisa_id=%s AND user_id=%s", (pesquisa_id, user_id))
-    saved = cur.fetchone() is not None
-    return liked, saved
+
+threading.Thread(target=_views_flusher, daemon=True, name="ipe-views-flush").start()
+atexit.register(_flush_views)
 
 
 # =========================================================
@@ -177,40 +426,147 @@ login_manager.login_message_category = "error"
 
 class User(UserMixin):
     def __init__(self, id, email, nome, instituicao):
-        self.id = id
+        # id como int desde a construção: as queries recebem sempre o mesmo
+        # tipo de parâmetro (plano preparado estável) e ninguém precisa de
+        # current_user.id; o get_id() do UserMixin já devolve str.
+        self.id = int(id)
         self.email = email
         self.nome = nome
         self.instituicao = instituicao
 
 
+# Cache em memória do usuário logado: sem isso, cada request autenticado
+# faz um SELECT em users só para reconstruir o mesmo objeto User.
+# TTL curto + invalidação explícita em login/logout.
+_USER_CACHE_TTL = 60  # segundos
+_USER_CACHE_MAX = 1024
+_user_cache = {}  # user_id (str) -> (expira_em, (id, email, nome, instituicao))
+_user_cache_lock = threading.Lock()
+
+
+def _user_cache_get(user_id: str):
+    with _user_cache_lock:
+        hit = _user_cache.get(user_id)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        _user_cache.pop(user_id, None)
+    return None
+
+
+def _user_cache_put(user_id: str, data: tuple):
+    with _user_cache_lock:
+        if len(_user_cache) >= _USER_CACHE_MAX:
+            _user_cache.clear()
+        _user_cache[user_id] = (time.monotonic() + _USER_CACHE_TTL, data)
+
+
+def _user_cache_drop(user_id: str):
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id, email, nome, instituicao FROM users WHERE id = %s", (user_id,))
-            row = cur.fetchone()
-            if row:
-                return User(row["id"], row["email"], row["nome"], row.get("instituicao"))
-    return None
+    user_id = str(user_id)
+
+    # escopo de request: vários acessos a current_user = no máximo 1 consulta
+    cached = getattr(g, "_cached_user", None)
+    if cached is not None and cached.get_id() == user_id:
+        return cached
+
+    data = _user_cache_get(user_id)
+    if data is None:
+        with get_conn(readonly=True) as conn:
+            # tuple_row: sem dict por linha num caminho que roda a cada request
+            with conn.cursor(row_factory=tuple_row) as cur:
+                cur.execute("SELECT id, email, nome, instituicao FROM users WHERE id = %s", (user_id,))
+                row = cur.fetchone()
+        if not row:
+            return None
+        data = row
+        _user_cache_put(user_id, data)
+
+    user = User(*data)
+    g._cached_user = user
+    return user
 
 
 # =========================================================
 # AUTH
 # =========================================================
+# Cache opcional de verificação de senha: evita refazer o KDF (centenas de
+# milhares de rodadas de pbkdf2) para a mesma credencial repetida. A senha
+# nunca entra em claro na chave — só um digest dela junto com o hash salvo.
+VERIFY_CACHE = os.environ.get("IPE_VERIFY_CACHE", "0").strip().lower() in ("1", "true", "yes")
+_VERIFY_CACHE_TTL = 300  # segundos
+_VERIFY_CACHE_MAX = 1024
+_verify_cache = {}  # (hash_salvo, sha256(senha)) -> (expira_em, ok)
+_verify_cache_lock = threading.Lock()
+
+
+# Hashes novos usam argon2 (o core em C solta a GIL — logins/cadastros
+# concorrentes escalam entre threads); contas antigas seguem verificáveis
+# no formato pbkdf2 do Werkzeug e são migradas no próximo login.
+PH = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+
+
+def hash_password(senha: str) -> str:
+    return PH.hash(senha)
+
+
+def _check_hash(stored_hash: str, senha: str) -> bool:
+    if stored_hash.startswith("$argon2"):
+        try:
+            return PH.verify(stored_hash, senha)
+        except VerificationError:
+            return False
+    # legado: hashes pbkdf2 gerados pelo Werkzeug antes da migração
+    return check_password_hash(stored_hash, senha)
+
+
+# O KDF (~100-300 ms de CPU) roda num pool próprio que limita hashes
+# concorrentes; como solta a GIL, o worker segue atendendo requisições.
+HASH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ipe-hash")
+atexit.register(HASH_POOL.shutdown)
+
+# hash de sacrifício: login com email inexistente verifica contra ele, para
+# a resposta demorar o mesmo com ou sem conta (sem oráculo de enumeração)
+_DUMMY_HASH = hash_password("ipe-dummy-timing")
+
+
+def verify_password(stored_hash: str, senha: str) -> bool:
+    if not VERIFY_CACHE:
+        return _check_hash(stored_hash, senha)
+
+    key = (stored_hash, hashlib.sha256(senha.encode()).digest())
+    now = time.monotonic()
+    with _verify_cache_lock:
+        hit = _verify_cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    ok = _check_hash(stored_hash, senha)
+    with _verify_cache_lock:
+        if len(_verify_cache) >= _VERIFY_CACHE_MAX:
+            _verify_cache.clear()
+        _verify_cache[key] = (now + _VERIFY_CACHE_TTL, ok)
+    return ok
+
+
 @app.route("/registro", methods=["GET", "POST"])
 def register():
     if current_user.is_authenticated:
         return redirect(url_for("index"))
 
     if request.method == "POST":
-        nome = (request.form.get("nome") or "").strip()
-        email = (request.form.get("email") or "").strip().lower()
-        senha = (request.form.get("senha") or "").strip()
-        senha2 = (request.form.get("senha2") or "").strip()
-        instituicao = (request.form.get("instituicao") or "").strip()
+        nome = form_str("nome")
+        email = form_str("email", lower=True)
+        senha = form_str("senha")
+        senha2 = form_str("senha2")
+        instituicao = form_str("instituicao")
 
         if REQUIRE_INVITE:
-            codigo = (request.form.get("codigo_convite") or "").strip()
+            codigo = form_str("codigo_convite")
             if codigo != INVITE_CODE:
                 flash("Código de convite inválido.", "error")
                 return render_template("register.html", app_name=APP_NAME, require_invite=REQUIRE_INVITE)
@@ -227,22 +583,27 @@ def register():
             flash("Senha muito curta. Use pelo menos 6 caracteres.", "error")
             return render_template("register.html", app_name=APP_NAME, require_invite=REQUIRE_INVITE)
 
+        hashed = HASH_POOL.submit(hash_password, senha).result()
+
+        # 1 round-trip, sem corrida: o UNIQUE(email) decide; se já existia,
+        # nada é inserido e não volta id
         with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT id FROM users WHERE email = %s", (email,))
-                if cur.fetchone():
-                    flash("Este email já está cadastrado.", "error")
-                    return render_template("register.html", app_name=APP_NAME, require_invite=REQUIRE_INVITE)
-
-                hashed = generate_password_hash(senha)
-                cur.execute(
-                    "INSERT INTO users (email, password, nome, instituicao) VALUES (%s, %s, %s, %s)",
-                    (email, hashed, nome, instituicao)
-                )
+            with conn.cursor(row_factory=tuple_row) as cur:
+                cur.execute("""
+                    INSERT INTO users (email, password, nome, instituicao)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (email) DO NOTHING
+                    RETURNING id
+                """, (email, hashed, nome, instituicao))
+                row = cur.fetchone()
             conn.commit()
 
+        if row is None:
+            flash("Este email já está cadastrado.", "error")
+            return render_template("register.html", app_name=APP_NAME, require_invite=REQUIRE_INVITE)
+
         flash("Conta criada com sucesso! Faça login.", "success")
-        return redirect(url_for("login"))
+        return redirect(url_for("login"), code=303)
 
     return render_template("register.html", app_name=APP_NAME, require_invite=REQUIRE_INVITE)
 
@@ -253,18 +614,28 @@ def login():
         return redirect(url_for("index"))
 
     if request.method == "POST":
-        email = (request.form.get("email") or "").strip().lower()
-        senha = (request.form.get("senha") or "").strip()
+        email = form_str("email", lower=True)
+        senha = form_str("senha")
 
-        with get_conn() as conn:
+        with get_conn(readonly=True) as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT * FROM users WHERE email = %s", (email,))
+                cur.execute("SELECT id, email, password, nome, instituicao FROM users WHERE email = %s", (email,))
                 row = cur.fetchone()
 
-        if row and check_password_hash(row["password"], senha):
+        ok = verify_password(row["password"] if row else _DUMMY_HASH, senha)
+        if row and ok:
+            # migra hashes legados (pbkdf2) ou com custo defasado para argon2
+            if not row["password"].startswith("$argon2") or PH.check_needs_rehash(row["password"]):
+                novo = HASH_POOL.submit(hash_password, senha).result()
+                with get_conn() as conn:
+                    with conn.cursor(row_factory=tuple_row) as cur:
+                        cur.execute("UPDATE users SET password=%s WHERE id=%s", (novo, row["id"]))
+                    conn.commit()
+
+            _user_cache_drop(str(row["id"]))
             login_user(User(row["id"], row["email"], row["nome"], row.get("instituicao")), remember=True)
             flash("Bem-vinda(o)!", "success")
-            return redirect(url_for("index"))
+            return redirect(url_for("index"), code=303)
 
         flash("Email ou senha incorretos.", "error")
 
@@ -274,6 +645,7 @@ def login():
 @app.route("/logout")
 @login_required
 def logout():
+    _user_cache_drop(current_user.get_id())
     logout_user()
     flash("Você saiu da conta.", "success")
     return redirect(url_for("index"))
@@ -282,106 +654,136 @@ def logout():
 # =========================================================
 # VITRINE + BUSCA
 # =========================================================
-@app.route("/")
-def index():
-    filtro_area = (request.args.get("area") or "").strip()
-    q = (request.args.get("q") or "").strip()
+# Cache do HTML da vitrine para visitantes anônimos: a página muda pouco e
+# é idêntica para todos eles. TTL curto + ETag para 304 sem corpo.
+_INDEX_CACHE_TTL = 30  # segundos
+_INDEX_CACHE_MAX = 512
+_index_cache = {}  # (area, q, cursor) -> (expira_em, html, etag)
+_index_cache_lock = threading.Lock()
 
-    where = []
-    params = []
 
-    if filtro_area and filtro_area in AREAS:
-        where.append("p.area = %s")
-        params.append(filtro_area)
+def _index_cache_clear():
+    # chamado quando o conteúdo da vitrine muda (publicar/editar/excluir):
+    # visitantes anônimos veem a novidade sem esperar o TTL vencer
+    with _index_cache_lock:
+        _index_cache.clear()
 
-    if q:
-        where.append("(p.titulo ILIKE %s OR p.descoberta ILIKE %s OR p.pesquisador ILIKE %s)")
-        like = f"%{q}%"
-        params.extend([like, like, like])
 
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
-
-    sql = f"""
+@app.route("/")
+def index():
+    filtro_area = (request.args.get("area") or "").strip()
+    q = (request.args.get("q") or "").strip()
+    cursor = request.args.get("cursor", type=int)
+
+    # só cacheia anônimo (logados veem estado próprio) e sem flash pendente
+    cache_key = None
+    if not current_user.is_authenticated and not session.get("_flashes"):
+        cache_key = (filtro_area, q, cursor or 0)
+        with _index_cache_lock:
+            hit = _index_cache.get(cache_key)
+        if hit and hit[0] > time.monotonic():
+            resp = make_response(hit[1])
+            resp.set_etag(hit[2])
+            return resp.make_conditional(request)
+
+    # uma única forma de SQL (filtros desligados viram parâmetro NULL):
+    # um só prepared statement no servidor para todas as combinações
+    params = {
+        "area": filtro_area if filtro_area in AREAS else None,
+        "busca": f"%{q}%" if q else None,
+        "cursor": cursor or None,  # keyset: "tudo abaixo do último id visto"
+        "limite": PAGE_SIZE,
+    }
+
+    # só o que o card usa; LEFT(..., 221) preserva o corte de 220 chars
+    # do template (o 221º só indica que havia mais texto)
+    sql = """
         SELECT
-          p.*,
-          COALESCE(l.likes_count, 0) AS likes_count,
-          COALESCE(s.saves_count, 0) AS saves_count
+          p.id, p.pesquisador, p.titulo, p.area, p.evidencia, p.imagem_url,
+          p.link_original, LEFT(p.descoberta, 221) AS descoberta,
+          p.views, p.likes_count, p.saves_count
         FROM pesquisas p
-        LEFT JOIN (
-          SELECT pesquisa_id, COUNT(*)::int AS likes_count
-          FROM likes
-          GROUP BY pesquisa_id
-        ) l ON l.pesquisa_id = p.id
-        LEFT JOIN (
-          SELECT pesquisa_id, COUNT(*)::int AS saves_count
-          FROM saves
-          GROUP BY pesquisa_id
-        ) s ON s.pesquisa_id = p.id
-        {where_sql}
+        WHERE (%(area)s::text IS NULL OR p.area = %(area)s)
+          AND (%(busca)s::text IS NULL
+               OR p.titulo ILIKE %(busca)s
+               OR p.descoberta ILIKE %(busca)s
+               OR p.pesquisador ILIKE %(busca)s)
+          AND (%(cursor)s::int IS NULL OR p.id < %(cursor)s)
         ORDER BY p.id DESC
+        LIMIT %(limite)s
     """
 
-    with get_conn() as conn:
+    with get_conn(readonly=True) as conn:
         with conn.cursor() as cur:
-            cur.execute(sql, tuple(params))
+            cur.execute(sql, params)
             pesquisas = cur.fetchall()
 
-    return render_template(
+    next_cursor = pesquisas[-1]["id"] if len(pesquisas) == PAGE_SIZE else None
+
+    html = render_template(
         "index.html",
         app_name=APP_NAME,
         pesquisas=pesquisas,
         areas=AREAS,
         filtro_area=filtro_area,
-        q=q
+        q=q,
+        next_cursor=next_cursor
     )
 
+    if cache_key is None:
+        return html
+
+    etag = hashlib.md5(html.encode()).hexdigest()[:16]
+    with _index_cache_lock:
+        if len(_index_cache) >= _INDEX_CACHE_MAX:
+            _index_cache.clear()
+        _index_cache[cache_key] = (time.monotonic() + _INDEX_CACHE_TTL, html, etag)
+
+    resp = make_response(html)
+    resp.set_etag(etag)
+    return resp.make_conditional(request)
+
 
 # =========================================================
 # PÁGINA INDIVIDUAL + VIEWS
 # =========================================================
 @app.route("/pesquisa/<int:pid>")
 def pesquisa(pid):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            # incrementa views
-            cur.execute("UPDATE pesquisas SET views = views + 1 WHERE id=%s", (pid,))
-            conn.commit()
+    uid = current_user.id if current_user.is_authenticated else None
 
-            # carrega a pesquisa + contagens
+    # Leitura pura em um round-trip: a pesquisa (com contadores) e o estado
+    # curtiu/salvou do usuário logado. O view vai para o buffer, não para o DB.
+    with get_conn(readonly=True) as conn:
+        with conn.cursor() as cur:
             cur.execute("""
                 SELECT
                   p.*,
-                  COALESCE(l.likes_count, 0) AS likes_count,
-                  COALESCE(s.saves_count, 0) AS saves_count
+                  (%s::int IS NOT NULL AND EXISTS (
+                    SELECT 1 FROM likes WHERE pesquisa_id = p.id AND user_id = %s
+                  )) AS liked,
+                  (%s::int IS NOT NULL AND EXISTS (
+                    SELECT 1 FROM saves WHERE pesquisa_id = p.id AND user_id = %s
+                  )) AS saved
                 FROM pesquisas p
-                LEFT JOIN (
-                  SELECT pesquisa_id, COUNT(*)::int AS likes_count
-                  FROM likes
-                  GROUP BY pesquisa_id
-                ) l ON l.pesquisa_id = p.id
-                LEFT JOIN (
-                  SELECT pesquisa_id, COUNT(*)::int AS saves_count
-                  FROM saves
-                  GROUP BY pesquisa_id
-                ) s ON s.pesquisa_id = p.id
                 WHERE p.id = %s
-            """, (pid,))
+            """, (uid, uid, uid, uid, pid))
             p = cur.fetchone()
 
-            if not p:
-                flash("Pesquisa não encontrada.", "error")
-                return redirect(url_for("index"))
+    if not p:
+        flash("Pesquisa não encontrada.", "error")
+        return redirect(url_for("index"))
 
-            liked = saved = False
-            if current_user.is_authenticated:
-                liked, saved = get_like_save_state(cur, pid, int(current_user.id))
+    # registra o view e mostra o total já com o que ainda não foi descarregado
+    with _view_lock:
+        _view_buffer[pid] += 1
+        p["views"] += _view_buffer[pid]
 
     return render_template(
         "pesquisa.html",
         app_name=APP_NAME,
         p=p,
-        liked=liked,
-        saved=saved,
+        liked=p["liked"],
+        saved=p["saved"],
         owner=is_owner(p)
     )
 
@@ -389,35 +791,39 @@ def pesquisa(pid):
 # =========================================================
 # LIKE / SAVE (TOGGLE)
 # =========================================================
+def _toggle_reacao(table: str, pid: int, user_id: int) -> None:
+    # Toggle atômico em 1 round-trip: tenta inserir; se já existia (conflito),
+    # o DELETE remove a linha antiga. Sem SELECT prévio, sem corrida entre
+    # dois cliques concorrentes. `table` é sempre literal interno, nunca input.
+    sql = f"""
+        WITH ins AS (
+          INSERT INTO {table} (pesquisa_id, user_id)
+          VALUES (%s, %s)
+          ON CONFLICT DO NOTHING
+          RETURNING 1
+        )
+        DELETE FROM {table}
+        WHERE pesquisa_id = %s AND user_id = %s
+          AND NOT EXISTS (SELECT 1 FROM ins)
+    """
+    with get_conn() as conn:
+        with conn.cursor(row_factory=tuple_row) as cur:
+            cur.execute(sql, (pid, user_id, pid, user_id))
+        conn.commit()
+
+
 @app.route("/pesquisa/<int:pid>/like", methods=["POST"])
 @login_required
 def toggle_like(pid):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            # existe?
-            cur.execute("SELECT 1 FROM likes WHERE pesquisa_id=%s AND user_id=%s", (pid, int(current_user.id)))
-            if cur.fetchone():
-                cur.execute("DELETE FROM likes WHERE pesquisa_id=%s AND user_id=%s", (pid, int(current_user.id)))
-            else:
-                cur.execute("INSERT INTO likes (pesquisa_id, user_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-                            (pid, int(current_user.id)))
-        conn.commit()
-    return redirect(request.referrer or url_for("pesquisa", pid=pid))
+    _toggle_reacao("likes", pid, current_user.id)
+    return redirect(request.referrer or url_for("pesquisa", pid=pid), code=303)
 
 
 @app.route("/pesquisa/<int:pid>/save", methods=["POST"])
 @login_required
 def toggle_save(pid):
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM saves WHERE pesquisa_id=%s AND user_id=%s", (pid, int(current_user.id)))
-            if cur.fetchone():
-                cur.execute("DELETE FROM saves WHERE pesquisa_id=%s AND user_id=%s", (pid, int(current_user.id)))
-            else:
-                cur.execute("INSERT INTO saves (pesquisa_id, user_id) VALUES (%s, %s) ON CONFLICT DO NOTHING",
-                            (pid, int(current_user.id)))
-        conn.commit()
-    return redirect(request.referrer or url_for("pesquisa", pid=pid))
+    _toggle_reacao("saves", pid, current_user.id)
+    return redirect(request.referrer or url_for("pesquisa", pid=pid), code=303)
 
 
 # =========================================================
@@ -427,16 +833,16 @@ def toggle_save(pid):
 @login_required
 def publicar():
     if request.method == "POST":
-        titulo = (request.form.get("titulo") or "").strip()
-        area = (request.form.get("area") or "").strip()
-        descoberta = (request.form.get("descoberta") or "").strip()
-        link_original_raw = (request.form.get("link_original") or "").strip()
+        titulo = form_str("titulo")
+        area = form_str("area")
+        descoberta = form_str("descoberta")
+        link_original_raw = form_str("link_original")
 
-        importancia = (request.form.get("importancia") or "").strip()
-        aplicacao = (request.form.get("aplicacao") or "").strip()
-        publico = (request.form.get("publico") or "").strip()
-        evidencia = (request.form.get("evidencia") or "Inicial").strip()
-        imagem_url = (request.form.get("imagem_url") or "").strip()
+        importancia = form_str("importancia")
+        aplicacao = form_str("aplicacao")
+        publico = form_str("publico")
+        evidencia = form_str("evidencia", "Inicial")
+        imagem_url = form_str("imagem_url")
 
         if not titulo or not area or not descoberta or not link_original_raw:
             flash("Preencha os campos obrigatórios.", "error")
@@ -457,7 +863,7 @@ def publicar():
                         importancia, aplicacao, publico, evidencia, link_original, imagem_url
                     ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
                 """, (
-                    int(current_user.id),
+                    current_user.id,
                     current_user.nome,
                     titulo,
                     area,
@@ -471,8 +877,9 @@ def publicar():
                 ))
             conn.commit()
 
+        _index_cache_clear()
         flash("Pesquisa publicada com sucesso!", "success")
-        return redirect(url_for("index"))
+        return redirect(url_for("index"), code=303)
 
     return render_template("publicar.html", app_name=APP_NAME, areas=AREAS, evidencias=EVIDENCIAS, form={})
 
@@ -483,30 +890,29 @@ def publicar():
 @app.route("/minhas")
 @login_required
 def minhas_pesquisas():
-    with get_conn() as conn:
+    cursor = request.args.get("cursor", type=int)
+
+    extra = "AND p.id < %s" if cursor else ""
+    params = [current_user.id]
+    if cursor:
+        params.append(cursor)
+    params.append(PAGE_SIZE)
+
+    with get_conn(readonly=True) as conn:
         with conn.cursor() as cur:
-            cur.execute("""
-                SELECT
-                  p.*,
-                  COALESCE(l.likes_count, 0) AS likes_count,
-                  COALESCE(s.saves_count, 0) AS saves_count
+            # id DESC segue a ordem de publicação e permite keyset pelo id
+            cur.execute(f"""
+                SELECT p.id, p.titulo, p.area, p.evidencia, p.descoberta, p.link_original
                 FROM pesquisas p
-                LEFT JOIN (
-                  SELECT pesquisa_id, COUNT(*)::int AS likes_count
-                  FROM likes
-                  GROUP BY pesquisa_id
-                ) l ON l.pesquisa_id = p.id
-                LEFT JOIN (
-                  SELECT pesquisa_id, COUNT(*)::int AS saves_count
-                  FROM saves
-                  GROUP BY pesquisa_id
-                ) s ON s.pesquisa_id = p.id
-                WHERE p.pesquisador_id = %s
-                ORDER BY p.data_publicacao DESC
-            """, (int(current_user.id),))
+                WHERE p.pesquisador_id = %s {extra}
+                ORDER BY p.id DESC
+                LIMIT %s
+            """, tuple(params))
             pesquisas = cur.fetchall()
 
-    return render_template("minhas.html", app_name=APP_NAME, pesquisas=pesquisas)
+    next_cursor = pesquisas[-1]["id"] if len(pesquisas) == PAGE_SIZE else None
+
+    return render_template("minhas.html", app_name=APP_NAME, pesquisas=pesquisas, next_cursor=next_cursor)
 
 
 @app.route("/pesquisa/<int:pid>/editar", methods=["GET", "POST"])
@@ -521,21 +927,21 @@ def editar_pesquisa(pid):
             flash("Pesquisa não encontrada.", "error")
             return redirect(url_for("index"))
 
-        if int(p["pesquisador_id"]) != int(current_user.id):
+        if int(p["pesquisador_id"]) != current_user.id:
             flash("Você não tem permissão para editar essa pesquisa.", "error")
             return redirect(url_for("index"))
 
         if request.method == "POST":
-            titulo = (request.form.get("titulo") or "").strip()
-            area = (request.form.get("area") or "").strip()
-            descoberta = (request.form.get("descoberta") or "").strip()
-            link_original_raw = (request.form.get("link_original") or "").strip()
+            titulo = form_str("titulo")
+            area = form_str("area")
+            descoberta = form_str("descoberta")
+            link_original_raw = form_str("link_original")
 
-            importancia = (request.form.get("importancia") or "").strip()
-            aplicacao = (request.form.get("aplicacao") or "").strip()
-            publico = (request.form.get("publico") or "").strip()
-            evidencia = (request.form.get("evidencia") or "Inicial").strip()
-            imagem_url = (request.form.get("imagem_url") or "").strip()
+            importancia = form_str("importancia")
+            aplicacao = form_str("aplicacao")
+            publico = form_str("publico")
+            evidencia = form_str("evidencia", "Inicial")
+            imagem_url = form_str("imagem_url")
 
             if not titulo or not area or not descoberta or not link_original_raw:
                 flash("Preencha os campos obrigatórios.", "error")
@@ -566,12 +972,13 @@ def editar_pesquisa(pid):
                 """, (
                     titulo, area, descoberta, importancia, aplicacao, publico,
                     evidencia, link_original, imagem_url,
-                    int(pid), int(current_user.id)
+                    int(pid), current_user.id
                 ))
             conn.commit()
 
+            _index_cache_clear()
             flash("Pesquisa atualizada!", "success")
-            return redirect(url_for("minhas_pesquisas"))
+            return redirect(url_for("minhas_pesquisas"), code=303)
 
     return render_template("editar.html", app_name=APP_NAME, areas=AREAS, evidencias=EVIDENCIAS, p=p)
 
@@ -581,10 +988,11 @@ def editar_pesquisa(pid):
 def excluir_pesquisa(pid):
     with get_conn() as conn:
         with conn.cursor() as cur:
-            cur.execute("DELETE FROM pesquisas WHERE id=%s AND pesquisador_id=%s", (int(pid), int(current_user.id)))
+            cur.execute("DELETE FROM pesquisas WHERE id=%s AND pesquisador_id=%s", (int(pid), current_user.id))
         conn.commit()
+    _index_cache_clear()
     flash("Pesquisa excluída.", "success")
-    return redirect(url_for("minhas_pesquisas"))
+    return redirect(url_for("minhas_pesquisas"), code=303)
 
 
 # =========================================================
@@ -593,30 +1001,31 @@ def excluir_pesquisa(pid):
 @app.route("/perfil/<nome>")
 def perfil(nome):
     nome = (nome or "").strip()
-    with get_conn() as conn:
+    cursor = request.args.get("cursor", type=int)
+
+    extra = "AND p.id < %s" if cursor else ""
+    params = [nome]
+    if cursor:
+        params.append(cursor)
+    params.append(PAGE_SIZE)
+
+    with get_conn(readonly=True) as conn:
         with conn.cursor() as cur:
-            cur.execute("""
+            cur.execute(f"""
                 SELECT
-                  p.*,
-                  COALESCE(l.likes_count, 0) AS likes_count,
-                  COALESCE(s.saves_count, 0) AS saves_count
+                  p.id, p.titulo, p.area, p.evidencia, p.descoberta,
+                  p.imagem_url, p.link_original,
+                  p.data_publicacao::text AS data_publicacao
                 FROM pesquisas p
-                LEFT JOIN (
-                  SELECT pesquisa_id, COUNT(*)::int AS likes_count
-                  FROM likes
-                  GROUP BY pesquisa_id
-                ) l ON l.pesquisa_id = p.id
-                LEFT JOIN (
-                  SELECT pesquisa_id, COUNT(*)::int AS saves_count
-                  FROM saves
-                  GROUP BY pesquisa_id
-                ) s ON s.pesquisa_id = p.id
-                WHERE p.pesquisador = %s
+                WHERE p.pesquisador = %s {extra}
                 ORDER BY p.id DESC
-            """, (nome,))
+                LIMIT %s
+            """, tuple(params))
             pesquisas = cur.fetchall()
 
-    return render_template("perfil.html", app_name=APP_NAME, pesquisas=pesquisas, nome=nome)
+    next_cursor = pesquisas[-1]["id"] if len(pesquisas) == PAGE_SIZE else None
+
+    return render_template("perfil.html", app_name=APP_NAME, pesquisas=pesquisas, nome=nome, next_cursor=next_cursor)
 
 
 @app.route("/sobre")